@@ -3,26 +3,99 @@ Streaming RAG-Based Environmental Intelligence System - Backend
 FastAPI server providing real-time environmental data and AI-assisted validation
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
 import uvicorn
-import json
+import orjson
 import os
-import base64
+import sys
 
 # Import our modules
 from yolo.detector import YOLODetector
-from aqi.stream import AQIStreamSimulator
+from yolo.batching import BatchScheduler
+from aqi.stream import CACHE_TTL_SECONDS, AQIStreamSimulator, AQICurrent, AQIHistoryEntry, CityAQI, AQIInsights
 from reports.processor import ReportProcessor
+from reports.worker import ValidationWorker
+
+# Micro-batching configuration for YOLO inference
+MAX_BATCH_SIZE = int(os.getenv("YOLO_MAX_BATCH_SIZE", "8"))
+BATCH_TIMEOUT = float(os.getenv("YOLO_BATCH_TIMEOUT", "0.02"))  # seconds
+
+# Largest accepted image upload, and the chunk size used to read it
+MAX_IMAGE_BYTES = int(os.getenv("MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Background report validation batching
+VALIDATION_BATCH_SIZE = int(os.getenv("VALIDATION_BATCH_SIZE", "16"))
+VALIDATION_BATCH_TIMEOUT = float(os.getenv("VALIDATION_BATCH_TIMEOUT", "0.05"))  # seconds
+
+# Seconds between Server-Sent Events on /api/stream/aqi; readings only change
+# once per AQI cache period, so a shorter interval just checks more often
+STREAM_INTERVAL = float(os.getenv("AQI_STREAM_INTERVAL", str(CACHE_TTL_SECONDS)))
+
+# Threads available for blocking work (YOLO inference, report processing)
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "4"))
+
+# Exported YOLOv8 ONNX model (e.g. INT8-quantized); detection is simulated when unset
+YOLO_ONNX_MODEL = os.getenv("YOLO_ONNX_MODEL")
+
+# Largest JSON array accepted by /api/report/submit-batch
+MAX_SUBMIT_BATCH = int(os.getenv("MAX_SUBMIT_BATCH", "100"))
+
+# PostgreSQL for report storage; reports stay in memory per worker when unset
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build services when the worker starts and release them on shutdown.
+    
+    Services live on `app.state` instead of module globals, so each uvicorn
+    worker loads its own models after the process starts and a failing model
+    load shows up as a startup error rather than an import error.
+    """
+    state = app.state
+    state.worker_pool = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="worker")
+    state.yolo = YOLODetector(model_path=YOLO_ONNX_MODEL)
+    state.batch_scheduler = BatchScheduler(
+        state.yolo,
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait=BATCH_TIMEOUT,
+        executor=state.worker_pool
+    )
+    state.aqi = AQIStreamSimulator()
+    state.reports = ReportProcessor(database_url=DATABASE_URL)
+    state.validator = ValidationWorker(
+        state.reports,
+        batch_scheduler=state.batch_scheduler,
+        executor=state.worker_pool,
+        max_batch_size=VALIDATION_BATCH_SIZE,
+        max_wait=VALIDATION_BATCH_TIMEOUT
+    )
+    
+    state.batch_scheduler.start()
+    state.validator.start()
+    yield
+    await state.validator.stop()
+    await state.batch_scheduler.stop()
+    state.worker_pool.shutdown(wait=True)
+    state.reports.close()
 
 # Initialize FastAPI
 app = FastAPI(
     title="Environmental Intelligence API",
     description="Real-time environmental data and AI-assisted citizen reporting",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson: C serializer, much faster than stdlib json
 )
 
 # CORS Configuration - Allow frontend to connect
@@ -32,13 +105,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
-# Initialize services
-yolo_detector = YOLODetector()
-aqi_simulator = AQIStreamSimulator()
-report_processor = ReportProcessor()
-
 # ============================================================================
 # MODELS
 # ============================================================================
@@ -70,14 +139,21 @@ class CityAQIResponse(BaseModel):
     aqi: int
     severity: str
 
+class AQIInsightsResponse(BaseModel):
+    city: str
+    insight: str
+    trend: str
+    rank: int
+    total_cities: int
+    avg_24h: float
+
 class ReportSubmission(BaseModel):
-    image_data: Optional[str] = None  # Base64 encoded
     category: str
     latitude: float
     longitude: float
     location_name: str
     yolo_result: Optional[Dict] = None
-    timestamp: str
+    timestamp: datetime  # ISO 8601; times without an offset are taken as UTC
 
 class ReportSubmissionResponse(BaseModel):
     report_id: str
@@ -86,6 +162,50 @@ class ReportSubmissionResponse(BaseModel):
     estimated_verification_time: int
     message: str
 
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+# Encoded body and ETag per cached payload object. The simulator's TTL cache
+# returns the same object for a whole bucket, so each payload is encoded and
+# hashed once. Entries keep a reference to the payload so its id stays unique.
+_encoded_payloads: Dict[int, Tuple[object, bytes, str]] = {}
+
+def etag_response(request: Request, payload) -> Response:
+    """
+    Serialize `payload` with an ETag, or answer 304 Not Modified when the
+    client's If-None-Match already matches it.
+    """
+    entry = _encoded_payloads.get(id(payload))
+    if entry is None or entry[0] is not payload:
+        body = orjson.dumps(payload)
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if len(_encoded_payloads) >= 256:
+            _encoded_payloads.clear()
+        entry = _encoded_payloads[id(payload)] = (payload, body, etag)
+    
+    _, body, etag = entry
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+async def read_upload(file: UploadFile) -> memoryview:
+    """
+    Read an uploaded file in chunks, rejecting it with 413 as soon as it
+    exceeds MAX_IMAGE_BYTES. Returns a memoryview so the detector can decode
+    it without another copy.
+    """
+    if file.size is not None and file.size > MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image exceeds {MAX_IMAGE_BYTES} bytes")
+    
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer += chunk
+        if len(buffer) > MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Image exceeds {MAX_IMAGE_BYTES} bytes")
+    
+    return memoryview(buffer)
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -105,10 +225,12 @@ async def root():
 # ----------------------------------------------------------------------------
 
 @app.post("/api/report/analyze-image", response_model=ImageAnalysisResponse)
-async def analyze_image(file: UploadFile = File(...)):
+async def analyze_image(request: Request, file: UploadFile = File(...)):
     """
     AI-assisted image analysis using YOLO object detection.
     
+    Concurrent requests are micro-batched so the model runs once per batch.
+    
     Returns:
     - Detected category with confidence scores
     - Object detection results
@@ -116,12 +238,12 @@ async def analyze_image(file: UploadFile = File(...)):
     
     NOTE: This is assistive intelligence, not authoritative measurement.
     """
+    # Read image file (size-capped)
+    image_data = await read_upload(file)
+    
     try:
-        # Read image file
-        image_data = await file.read()
-        
-        # Run YOLO detection
-        result = yolo_detector.analyze(image_data)
+        # Run YOLO detection (batched with other in-flight requests)
+        result = await request.app.state.batch_scheduler.submit(image_data)
         
         return ImageAnalysisResponse(**result)
     
@@ -132,8 +254,12 @@ async def analyze_image(file: UploadFile = File(...)):
 # 2️⃣ AQI CURRENT DATA
 # ----------------------------------------------------------------------------
 
-@app.get("/api/aqi/current", response_model=AQICurrentResponse)
-async def get_current_aqi(city: str = Query(..., description="City name (e.g., Delhi)")):
+@app.get(
+    "/api/aqi/current",
+    response_model=None,
+    responses={200: {"model": AQICurrentResponse}}  # Documented shape, not re-validated
+)
+async def get_current_aqi(request: Request, city: str = Query(..., description="City name (e.g., Delhi)")) -> AQICurrent:
     """
     Get current AQI data for a city.
     
@@ -141,8 +267,7 @@ async def get_current_aqi(city: str = Query(..., description="City name (e.g., D
     For demo, this simulates realistic streaming data.
     """
     try:
-        aqi_data = aqi_simulator.get_current(city)
-        return AQICurrentResponse(**aqi_data)
+        return request.app.state.aqi.get_current(city)
     
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -153,21 +278,28 @@ async def get_current_aqi(city: str = Query(..., description="City name (e.g., D
 # 3️⃣ AQI HISTORY
 # ----------------------------------------------------------------------------
 
-@app.get("/api/aqi/history", response_model=List[AQIHistoryPoint])
+@app.get(
+    "/api/aqi/history",
+    response_model=None,
+    responses={200: {"model": List[AQIHistoryPoint]}}  # Documented shape, not re-validated
+)
 async def get_aqi_history(
+    request: Request,
     city: str = Query(..., description="City name"),
     range: str = Query("24h", description="Time range: 24h or 7d")
-):
+) -> Response:
     """
     Get historical AQI data for time-series visualization.
     
     Supports:
     - 24h: Hourly data points
     - 7d: Daily data points
+    
+    Sends an ETag; clients revalidating with If-None-Match get 304 while the data is unchanged.
     """
     try:
-        history = aqi_simulator.get_history(city, range)
-        return [AQIHistoryPoint(**point) for point in history]
+        history: List[AQIHistoryEntry] = request.app.state.aqi.get_history(city, range)
+        return etag_response(request, history)
     
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -178,15 +310,21 @@ async def get_aqi_history(
 # 4️⃣ CITY AQI MAP DATA
 # ----------------------------------------------------------------------------
 
-@app.get("/api/cities", response_model=List[CityAQIResponse])
-async def get_cities_aqi():
+@app.get(
+    "/api/cities",
+    response_model=None,
+    responses={200: {"model": List[CityAQIResponse]}}  # Documented shape, not re-validated
+)
+async def get_cities_aqi(request: Request) -> Response:
     """
     Get AQI data for all major Indian cities.
     Used for heatmap and leaderboard visualization.
+    
+    Sends an ETag; clients revalidating with If-None-Match get 304 while the data is unchanged.
     """
     try:
-        cities = aqi_simulator.get_all_cities()
-        return [CityAQIResponse(**city) for city in cities]
+        cities: List[CityAQI] = request.app.state.aqi.get_all_cities()
+        return etag_response(request, cities)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch cities: {str(e)}")
@@ -196,14 +334,27 @@ async def get_cities_aqi():
 # ----------------------------------------------------------------------------
 
 @app.post("/api/report/submit", response_model=ReportSubmissionResponse)
-async def submit_report(report: ReportSubmission):
+async def submit_report(
+    request: Request,
+    file: Optional[UploadFile] = File(None, description="Optional evidence image"),
+    category: str = Form(...),
+    latitude: float = Form(...),
+    longitude: float = Form(...),
+    location_name: str = Form(...),
+    yolo_result: Optional[str] = Form(None, description="YOLO detection output as JSON"),
+    timestamp: datetime = Form(..., description="ISO 8601 submission time")
+):
     """
     Submit a citizen environmental report.
     
+    Sent as multipart/form-data: the image travels as raw binary in `file`
+    (no base64 encoding), the remaining fields as form values.
+    
     Process:
-    1. Store report data
-    2. Queue for AI-assisted validation
-    3. Return tracking information
+    1. Queue report for AI-assisted validation
+    2. Return tracking information immediately
+    3. Background worker validates queued reports in batches
+       (images without a YOLO result are analyzed server-side)
     
     Validation considers:
     - YOLO detection results
@@ -212,25 +363,73 @@ async def submit_report(report: ReportSubmission):
     - Community consensus (future)
     """
     try:
-        result = report_processor.process_submission(report.dict())
+        parsed_yolo_result = orjson.loads(yolo_result) if yolo_result else None
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=422, detail="yolo_result must be valid JSON")
+    
+    try:
+        report = ReportSubmission(
+            category=category,
+            latitude=latitude,
+            longitude=longitude,
+            location_name=location_name,
+            yolo_result=parsed_yolo_result,
+            timestamp=timestamp
+        )
+    except ValidationError:
+        # Form fields are already typed, so only yolo_result can fail here
+        # (valid JSON that isn't an object, e.g. `[1]` or `"x"`)
+        raise HTTPException(status_code=422, detail="yolo_result must be a JSON object")
+    
+    image_data = await read_upload(file) if file is not None else None
+    
+    try:
+        # Acknowledge immediately; validation runs in the background worker
+        result = request.app.state.validator.submit(report.dict(), image_data)
         return ReportSubmissionResponse(**result)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Report submission failed: {str(e)}")
 
+@app.post("/api/report/submit-batch", response_model=List[ReportSubmissionResponse])
+async def submit_report_batch(request: Request, reports: List[ReportSubmission]):
+    """
+    Submit several citizen reports in one request.
+    
+    Sent as a JSON array of reports without images (attach evidence through
+    `/api/report/submit`). Every report is queued for the background worker,
+    which validates and stores queued reports with one bulk insert per batch.
+    Acknowledgements are returned in submission order.
+    """
+    if len(reports) > MAX_SUBMIT_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_SUBMIT_BATCH} reports per batch"
+        )
+    
+    try:
+        validator = request.app.state.validator
+        return [ReportSubmissionResponse(**validator.submit(report.dict())) for report in reports]
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Report submission failed: {str(e)}")
+
 # ----------------------------------------------------------------------------
 # 6️⃣ AI INSIGHTS
 # ----------------------------------------------------------------------------
 
-@app.get("/api/insights/aqi")
-async def get_aqi_insights(city: str = Query(...)):
+@app.get(
+    "/api/insights/aqi",
+    response_model=None,
+    responses={200: {"model": AQIInsightsResponse}}  # Documented shape, not re-validated
+)
+async def get_aqi_insights(request: Request, city: str = Query(...)) -> AQIInsights:
     """
     Get AI-generated natural language insights about AQI trends.
     Explains patterns, comparisons, and context.
     """
     try:
-        insights = aqi_simulator.get_insights(city)
-        return insights
+        return request.app.state.aqi.get_insights(city)
     
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -242,7 +441,7 @@ async def get_aqi_insights(city: str = Query(...)):
 # ----------------------------------------------------------------------------
 
 @app.get("/api/report/status/{report_id}")
-async def get_report_status(report_id: str):
+async def get_report_status(request: Request, report_id: str):
     """
     Check validation status of a submitted report.
     
@@ -253,7 +452,11 @@ async def get_report_status(report_id: str):
     - rejected: Could not verify
     """
     try:
-        status = report_processor.get_status(report_id)
+        # Storage lookups may hit the database; keep them off the event loop
+        state = request.app.state
+        status = await asyncio.get_running_loop().run_in_executor(
+            state.worker_pool, state.reports.get_status, report_id
+        )
         return status
     
     except ValueError as e:
@@ -262,19 +465,42 @@ async def get_report_status(report_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to fetch status: {str(e)}")
 
 # ============================================================================
-# STREAMING ENDPOINT (FUTURE ENHANCEMENT)
+# STREAMING ENDPOINT
 # ============================================================================
 
 @app.get("/api/stream/aqi")
-async def stream_aqi(city: str = Query(...)):
+async def stream_aqi(request: Request, city: str = Query(...)):
     """
-    WebSocket endpoint for real-time AQI streaming (future implementation).
-    Would use Server-Sent Events or WebSocket for live updates.
+    Real-time AQI stream using Server-Sent Events.
+    
+    Sends the current AQI reading as `data: {json}` over one long-lived
+    connection, replacing client-side polling of /api/aqi/current. Readings
+    come from the simulator's TTL cache, so clients watching the same city
+    share one computation per cache period; the cache is checked every
+    STREAM_INTERVAL seconds and an event is sent only when the reading changed.
     """
-    return {
-        "message": "Streaming endpoint - implement with WebSockets for production",
-        "city": city
-    }
+    aqi_simulator = request.app.state.aqi
+    
+    try:
+        aqi_simulator.get_current(city)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    async def event_stream():
+        last = None
+        while not await request.is_disconnected():
+            reading = aqi_simulator.get_current(city)
+            # Same cached object until the TTL expires; don't resend it
+            if reading is not last:
+                yield b"data: " + orjson.dumps(reading) + b"\n\n"
+                last = reading
+            await asyncio.sleep(STREAM_INTERVAL)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # ============================================================================
 # MAIN
@@ -285,10 +511,21 @@ if __name__ == "__main__":
     print("📡 Endpoints available at http://localhost:8000")
     print("📚 API Documentation: http://localhost:8000/docs")
     
+    # DEV=1 enables auto-reload (single process). Otherwise run
+    # UVICORN_WORKERS processes; each worker imports this module and builds
+    # its own detector and simulator after the process starts.
+    dev_mode = os.getenv("DEV") == "1"
+    
+    # uvloop (libuv event loop) and httptools (C HTTP parser) come with
+    # uvicorn[standard] but are not available on Windows
+    fast_io = {} if sys.platform == "win32" else {"loop": "uvloop", "http": "httptools"}
+    
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        workers=1 if dev_mode else int(os.getenv("UVICORN_WORKERS", "1")),
+        reload=dev_mode,
+        log_level="info",
+        **fast_io
     )
@@ -1,3 +1,3 @@
-from .stream import AQIStreamSimulator
+from .stream import AQIStreamSimulator, AQICurrent, AQIHistoryEntry, CityAQI, AQIInsights
 
-__all__ = ['AQIStreamSimulator']
+__all__ = ['AQIStreamSimulator', 'AQICurrent', 'AQIHistoryEntry', 'CityAQI', 'AQIInsights']
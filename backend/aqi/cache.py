@@ -0,0 +1,42 @@
+"""
+Process-local TTL cache for simulator responses.
+
+Results are memoized per wall-clock bucket: every call within the same
+`seconds`-wide window of `time.monotonic()` with the same arguments returns
+the same object. Older buckets simply age out of the underlying LRU.
+
+Each uvicorn worker keeps its own cache. For a shared cache across workers,
+back this with Redis keyed as `aqi:{city}:{bucket}`.
+"""
+
+import functools
+import time
+from typing import Callable
+
+
+def ttl_cache(seconds: float, maxsize: int = 256) -> Callable:
+    """
+    Cache a function's results for `seconds`.
+
+    Args:
+        seconds: Lifetime of a cached result
+        maxsize: Maximum number of (bucket, arguments) entries kept
+
+    Returns:
+        Decorator. The wrapped function exposes `cache_clear()` and `cache_info()`.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.lru_cache(maxsize=maxsize)
+        def cached(bucket: int, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bucket = int(time.monotonic() // seconds)
+            return cached(bucket, *args, **kwargs)
+
+        wrapper.cache_clear = cached.cache_clear
+        wrapper.cache_info = cached.cache_info
+        return wrapper
+
+    return decorator
@@ -14,18 +14,92 @@ For demo, simulates realistic patterns with:
 - City-specific characteristics
 """
 
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import math
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional, Tuple, TypedDict
+import numpy as np
+
+from .cache import ttl_cache
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernel below then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# ============================================================================
+# RESPONSE SHAPES
+# ============================================================================
+
+class AQICurrent(TypedDict):
+    city: str
+    aqi: int
+    pm25: float
+    pm10: float
+    timestamp: str
+    severity: str
+    description: str
+
+class AQIHistoryEntry(TypedDict):
+    time: str
+    aqi: int
+
+class CityAQI(TypedDict):
+    name: str
+    lat: float
+    lng: float
+    aqi: int
+    severity: str
+
+class AQIInsights(TypedDict):
+    city: str
+    insight: str
+    trend: str
+    rank: int
+    total_cities: int
+    avg_24h: float
+
+# How long computed AQI responses are reused before recomputing
+CACHE_TTL_SECONDS = 15
+
+# How long generated insight sentences are reused
+INSIGHT_CACHE_SECONDS = 300
+
+@njit(cache=True)
+def _calc_aqi_scalar(baseline: float, seasonal_factor: float, hour: int,
+                     day_of_week: int, noise: float) -> float:
+    """
+    Single-point AQI formula, compiled to native code when numba is installed.
+    
+    `noise` is drawn by the caller so the random generator stays in Python.
+    """
+    # Diurnal pattern: peaks at 8-10 AM and 7-9 PM (traffic hours)
+    morning_peak = math.exp(-((hour - 9) ** 2) / 8) * 30
+    evening_peak = math.exp(-((hour - 20) ** 2) / 8) * 35
+    
+    # Weekend effect (20% lower on Sunday)
+    weekend_factor = 0.8 if day_of_week == 6 else 1.0
+    
+    aqi = baseline * seasonal_factor * weekend_factor + morning_peak + evening_peak + noise
+    
+    # Ensure AQI stays in valid range [0, 500]
+    return max(0.0, min(500.0, aqi))
 
 class AQIStreamSimulator:
     """
     Simulates real-time AQI data streams for major Indian cities.
     """
     
-    def __init__(self):
-        """Initialize with city configurations"""
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initialize with city configurations.
+        
+        Args:
+            seed: Seed for the simulator's random generator (for reproducible data)
+        """
+        # One generator for all simulated noise, so values can be drawn in bulk
+        self._rng = np.random.default_rng(seed)
         
         # Major Indian cities with realistic baseline AQI levels
         self.cities = {
@@ -90,8 +164,25 @@ class AQIStreamSimulator:
                 "seasonal_factor": 1.2
             }
         }
+        
+        # Same configuration as parallel arrays (one entry per city, in
+        # `self._names` order) so all cities can be computed in one pass
+        self._names = list(self.cities.keys())
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._baseline = np.array([c["baseline_aqi"] for c in self.cities.values()], dtype=np.float64)
+        self._variance = np.array([c["variance"] for c in self.cities.values()], dtype=np.float64)
+        self._seasonal_factor = np.array([c["seasonal_factor"] for c in self.cities.values()], dtype=np.float64)
+        self._lat = np.array([c["lat"] for c in self.cities.values()], dtype=np.float64)
+        self._lng = np.array([c["lng"] for c in self.cities.values()], dtype=np.float64)
+        
+        # Lookup tables indexed by int(AQI) over the valid range [0, 500],
+        # built once from the piecewise definitions below
+        self._pm25_lut = tuple(self._aqi_to_pm25_impl(aqi) for aqi in range(501))
+        self._sev_lut = tuple(self._get_severity_impl(aqi) for aqi in range(501))
+        self._desc_lut = tuple(self._get_description_impl(aqi) for aqi in range(501))
     
-    def get_current(self, city: str) -> Dict:
+    @ttl_cache(seconds=CACHE_TTL_SECONDS)
+    def get_current(self, city: str) -> AQICurrent:
         """
         Get current AQI data for a city with realistic time-based variation.
         
@@ -128,7 +219,8 @@ class AQIStreamSimulator:
             "description": description
         }
     
-    def get_history(self, city: str, time_range: str) -> List[Dict]:
+    @ttl_cache(seconds=CACHE_TTL_SECONDS)
+    def get_history(self, city: str, time_range: str) -> List[AQIHistoryEntry]:
         """
         Get historical AQI data for time-series visualization.
         
@@ -142,65 +234,63 @@ class AQIStreamSimulator:
         if city not in self.cities:
             raise ValueError(f"City '{city}' not found")
         
-        city_data = self.cities[city]
+        idx = self._index[city]
         current_time = datetime.now()
-        data_points = []
         
         if time_range == "24h":
             # Hourly data for past 24 hours
-            for hours_ago in range(24, -1, -1):
-                timestamp = current_time - timedelta(hours=hours_ago)
-                aqi = self._calculate_realistic_aqi(city_data, timestamp)
-                
-                data_points.append({
-                    "time": timestamp.strftime("%H:%M"),
-                    "aqi": int(aqi)
-                })
+            epochs = self._hourly_epochs(current_time)
+            hours, weekdays = self._time_features(epochs)
+            
+            # Every point shares the current minute, so labels need no datetime
+            minute = current_time.minute
+            labels = [f"{hour:02d}:{minute:02d}" for hour in hours.tolist()]
         
         elif time_range == "7d":
-            # Daily average for past 7 days
-            for days_ago in range(7, -1, -1):
-                timestamp = current_time - timedelta(days=days_ago)
-                
-                # Average AQI for the day (simulate by using noon time)
-                noon_time = timestamp.replace(hour=12, minute=0, second=0)
-                aqi = self._calculate_realistic_aqi(city_data, noon_time)
-                
-                data_points.append({
-                    "time": timestamp.strftime("%b %d"),
-                    "aqi": int(aqi)
-                })
+            # Daily average for past 7 days (simulate by using noon time)
+            epochs = int(current_time.timestamp()) - np.arange(7, -1, -1, dtype=np.int64) * 86400
+            _, weekdays = self._time_features(epochs)
+            hours = 12
+            labels = [datetime.fromtimestamp(t).strftime("%b %d") for t in epochs.tolist()]
         
         else:
             raise ValueError(f"Invalid time range: {time_range}. Use '24h' or '7d'")
         
-        return data_points
+        aqis = self._aqi_kernel(
+            self._baseline[idx], self._variance[idx], self._seasonal_factor[idx], hours, weekdays
+        ).astype(np.int64).tolist()
+        
+        return [
+            {"time": label, "aqi": aqi}
+            for label, aqi in zip(labels, aqis)
+        ]
     
-    def get_all_cities(self) -> List[Dict]:
+    @ttl_cache(seconds=CACHE_TTL_SECONDS)
+    def get_all_cities(self) -> List[CityAQI]:
         """
         Get current AQI for all cities (for map and leaderboard).
         """
-        current_time = datetime.now()
-        cities_data = []
-        
-        for city_name, city_config in self.cities.items():
-            aqi = self._calculate_realistic_aqi(city_config, current_time)
-            severity = self._get_severity(aqi)
-            
-            cities_data.append({
-                "name": city_name,
-                "lat": city_config["lat"],
-                "lng": city_config["lng"],
-                "aqi": int(aqi),
-                "severity": severity
-            })
+        aqis = self._calc_aqi_vec(datetime.now()).astype(np.int64)
         
         # Sort by AQI (worst first)
-        cities_data.sort(key=lambda x: x["aqi"], reverse=True)
-        
-        return cities_data
+        order = np.argsort(-aqis, kind="stable")
+        
+        lats = self._lat.tolist()
+        lngs = self._lng.tolist()
+        aqi_values = aqis.tolist()
+        
+        return [
+            {
+                "name": self._names[i],
+                "lat": lats[i],
+                "lng": lngs[i],
+                "aqi": aqi_values[i],
+                "severity": self._get_severity(aqi_values[i])
+            }
+            for i in order.tolist()
+        ]
     
-    def get_insights(self, city: str) -> Dict:
+    def get_insights(self, city: str) -> AQIInsights:
         """
         Generate AI-powered insights about AQI trends.
         
@@ -209,22 +299,30 @@ class AQIStreamSimulator:
         if city not in self.cities:
             raise ValueError(f"City '{city}' not found")
         
-        current = self.get_current(city)
-        history_24h = self.get_history(city, "24h")
+        # One pass over all cities: current AQI, ranking and 24h history
+        names, aqis_now, history = self._snapshot()
+        idx = self._index[city]
+        
+        current_aqi = int(aqis_now[idx])
+        severity = self._get_severity(current_aqi)
         
         # Calculate trend
-        aqi_values = [point["aqi"] for point in history_24h]
-        trend = "increasing" if aqi_values[-1] > aqi_values[0] else "decreasing"
-        avg_24h = sum(aqi_values) / len(aqi_values)
+        city_history = history[idx]
+        trend = "increasing" if city_history[-1] > city_history[0] else "decreasing"
+        avg_24h = float(city_history.mean())
         
-        # Compare to other cities
-        all_cities = self.get_all_cities()
-        rank = next(i for i, c in enumerate(all_cities, 1) if c["name"] == city)
+        # Compare to other cities (worst first, same ordering as get_all_cities)
+        order = np.argsort(-aqis_now, kind="stable")
+        rank = int(np.flatnonzero(order == idx)[0]) + 1
+        total = len(names)
         
-        # Generate insight text
+        # Generate insight text. Inputs are quantized (AQI to 10, average to 5)
+        # so requests in the same conditions reuse a cached sentence.
+        hour = datetime.now().hour
         insight_text = self._generate_insight_text(
-            city, current["aqi"], current["severity"], 
-            trend, avg_24h, rank, len(all_cities)
+            city, int(round(current_aqi, -1)), severity, 
+            trend, int(round(avg_24h / 5) * 5), rank, total,
+            traffic_hour=7 <= hour <= 10 or 18 <= hour <= 21
         )
         
         return {
@@ -232,7 +330,7 @@ class AQIStreamSimulator:
             "insight": insight_text,
             "trend": trend,
             "rank": rank,
-            "total_cities": len(all_cities),
+            "total_cities": total,
             "avg_24h": round(avg_24h, 1)
         }
     
@@ -240,6 +338,40 @@ class AQIStreamSimulator:
     # PRIVATE HELPER METHODS
     # ========================================================================
     
+    @ttl_cache(seconds=CACHE_TTL_SECONDS)
+    def _snapshot(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Compute hourly AQI over the past 24 hours for every city in one pass.
+        
+        Returns:
+            (city names, current AQI per city, history array of shape
+            (cities, 25) ending at the current hour), all in `self._names` order
+        """
+        hours, weekdays = self._time_features(self._hourly_epochs(datetime.now()))
+        
+        history = self._aqi_kernel(
+            self._baseline[:, None], self._variance[:, None], self._seasonal_factor[:, None],
+            hours, weekdays
+        ).astype(np.int64)
+        
+        return self._names, history[:, -1], history
+    
+    def _hourly_epochs(self, current_time: datetime) -> np.ndarray:
+        """POSIX timestamps (int64) for the past 24 hours, oldest first, ending at `current_time`"""
+        return int(current_time.timestamp()) - np.arange(24, -1, -1, dtype=np.int64) * 3600
+    
+    def _time_features(self, epochs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Local hour of day and weekday (Monday=0) for int64 POSIX timestamps.
+        
+        Pure integer arithmetic instead of per-point datetime attribute access.
+        Uses the current UTC offset for the whole series.
+        """
+        local = epochs + time.localtime().tm_gmtoff
+        hours = (local // 3600) % 24
+        weekdays = (local // 86400 + 3) % 7  # 1970-01-01 was a Thursday (weekday 3)
+        return hours, weekdays
+    
     def _calculate_realistic_aqi(self, city_data: Dict, timestamp: datetime) -> float:
         """
         Calculate realistic AQI with time-based variation.
@@ -251,31 +383,65 @@ class AQIStreamSimulator:
         - Random variance
         - Seasonal adjustment
         """
-        baseline = city_data["baseline_aqi"]
-        variance = city_data["variance"]
-        seasonal_factor = city_data["seasonal_factor"]
+        # Random variance (Gaussian noise)
+        noise = self._rng.normal(0, city_data["variance"] * 0.3)
         
-        hour = timestamp.hour
-        day_of_week = timestamp.weekday()
+        return _calc_aqi_scalar(
+            float(city_data["baseline_aqi"]), float(city_data["seasonal_factor"]),
+            timestamp.hour, timestamp.weekday(), noise
+        )
+    
+    def _calc_aqi_vec(self, timestamp: datetime) -> np.ndarray:
+        """
+        Vectorized `_calculate_realistic_aqi` for every city at one timestamp.
         
-        # Diurnal pattern: peaks at 8-10 AM and 7-9 PM (traffic hours)
-        morning_peak = math.exp(-((hour - 9) ** 2) / 8) * 30
-        evening_peak = math.exp(-((hour - 20) ** 2) / 8) * 35
-        diurnal_factor = morning_peak + evening_peak
+        Returns:
+            Array of AQI values in `self._names` order
+        """
+        return self._aqi_kernel(
+            self._baseline, self._variance, self._seasonal_factor,
+            timestamp.hour, timestamp.weekday()
+        )
+    
+    def _aqi_kernel(self, baseline, variance, seasonal_factor, hour, weekday) -> np.ndarray:
+        """
+        Array form of the `_calculate_realistic_aqi` formula.
         
-        # Weekend effect (20% lower on Sunday)
-        weekend_factor = 0.8 if day_of_week == 6 else 1.0
+        Inputs broadcast against each other, e.g. all cities at one hour, or
+        one city across a series of hours.
+        """
+        morning_peak = np.exp(-((hour - 9) ** 2) / 8) * 30
+        evening_peak = np.exp(-((hour - 20) ** 2) / 8) * 35
+        weekend_factor = np.where(weekday == 6, 0.8, 1.0)
         
-        # Random variance (Gaussian noise)
-        noise = random.gauss(0, variance * 0.3)
+        # One independent draw per output point, whichever input carries the series
+        shape = np.broadcast_shapes(np.shape(baseline), np.shape(hour), np.shape(weekday))
+        noise = self._rng.normal(0, variance * 0.3, size=shape)
         
-        # Combine all factors
-        aqi = baseline * seasonal_factor * weekend_factor + diurnal_factor + noise
+        aqi = baseline * seasonal_factor * weekend_factor + morning_peak + evening_peak + noise
         
-        # Ensure AQI stays in valid range [0, 500]
-        return max(0, min(500, aqi))
+        return np.clip(aqi, 0, 500)
     
     def _aqi_to_pm25(self, aqi: float) -> float:
+        """Convert AQI to approximate PM2.5 concentration (µg/m³) via lookup table"""
+        return self._pm25_lut[int(aqi)]
+    
+    def _aqi_to_pm10(self, aqi: float) -> float:
+        """Convert AQI to approximate PM10 concentration (µg/m³)"""
+        # PM10 typically 1.5-2x PM2.5
+        pm25 = self._aqi_to_pm25(aqi)
+        return pm25 * self._rng.uniform(1.5, 2.0)
+    
+    def _get_severity(self, aqi: float) -> str:
+        """Map AQI to severity category via lookup table"""
+        return self._sev_lut[int(aqi)]
+    
+    def _get_description(self, aqi: float) -> str:
+        """Get human-readable description of AQI level via lookup table"""
+        return self._desc_lut[int(aqi)]
+    
+    @staticmethod
+    def _aqi_to_pm25_impl(aqi: float) -> float:
         """Convert AQI to approximate PM2.5 concentration (µg/m³)"""
         # Simplified conversion (real conversion uses breakpoint tables)
         if aqi <= 50:
@@ -291,13 +457,8 @@ class AQIStreamSimulator:
         else:
             return 250.5 + (aqi - 300) * 1.0
     
-    def _aqi_to_pm10(self, aqi: float) -> float:
-        """Convert AQI to approximate PM10 concentration (µg/m³)"""
-        # PM10 typically 1.5-2x PM2.5
-        pm25 = self._aqi_to_pm25(aqi)
-        return pm25 * random.uniform(1.5, 2.0)
-    
-    def _get_severity(self, aqi: float) -> str:
+    @staticmethod
+    def _get_severity_impl(aqi: float) -> str:
         """Map AQI to severity category"""
         if aqi <= 50:
             return "good"
@@ -312,7 +473,8 @@ class AQIStreamSimulator:
         else:
             return "hazardous"
     
-    def _get_description(self, aqi: float) -> str:
+    @staticmethod
+    def _get_description_impl(aqi: float) -> str:
         """Get human-readable description of AQI level"""
         if aqi <= 50:
             return "Air quality is satisfactory, and air pollution poses little or no risk."
@@ -327,9 +489,11 @@ class AQIStreamSimulator:
         else:
             return "Health warning of emergency conditions: everyone affected."
     
+    @ttl_cache(seconds=INSIGHT_CACHE_SECONDS, maxsize=1024)
     def _generate_insight_text(self, city: str, current_aqi: int, severity: str, 
-                               trend: str, avg_24h: float, rank: int, total: int) -> str:
-        """Generate natural language insight"""
+                               trend: str, avg_24h: float, rank: int, total: int,
+                               traffic_hour: bool = False) -> str:
+        """Generate natural language insight (memoized on its coarse inputs)"""
         
         severity_phrases = {
             "good": "enjoying good air quality",
@@ -346,8 +510,8 @@ class AQIStreamSimulator:
         }
         
         insight = f"{city} is currently {severity_phrases.get(severity, 'experiencing varying air quality')} "
-        insight += f"with an AQI of {current_aqi}, {trend_phrases[trend]}. "
-        insight += f"The 24-hour average stands at {round(avg_24h)}. "
+        insight += f"with an AQI of around {current_aqi}, {trend_phrases[trend]}. "
+        insight += f"The 24-hour average stands at around {round(avg_24h)}. "
         
         if rank <= 3:
             insight += f"⚠️ {city} ranks #{rank} among the {total} monitored cities for poorest air quality. "
@@ -355,8 +519,7 @@ class AQIStreamSimulator:
             insight += f"✓ {city} ranks #{rank} among the {total} monitored cities, showing relatively better conditions. "
         
         # Time-specific advice
-        hour = datetime.now().hour
-        if 7 <= hour <= 10 or 18 <= hour <= 21:
+        if traffic_hour:
             insight += "Traffic-hour peaks are typical during this time. "
         
         return insight
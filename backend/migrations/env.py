@@ -0,0 +1,41 @@
+"""
+Alembic environment for the report database.
+
+Migrations are plain SQL (there are no ORM models), so no metadata is
+attached. Run with `alembic upgrade head` and DATABASE_URL set.
+"""
+
+import os
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+
+def database_url() -> str:
+    """DATABASE_URL, pointed at the psycopg 3 driver"""
+    url = os.environ["DATABASE_URL"]
+    if url.startswith("postgresql://"):
+        url = "postgresql+psycopg://" + url[len("postgresql://"):]
+    return url
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL instead of running it (`alembic upgrade head --sql`)"""
+    context.configure(url=database_url(), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations against the database"""
+    engine = create_engine(database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        context.configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,38 @@
+"""Create reports table
+
+Fixed, frequently filtered fields get their own columns; everything else
+about a report (YOLO output, validation reason, ...) lives in `data`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+"""
+
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS reports (
+            report_id         text PRIMARY KEY,
+            category          text NOT NULL,
+            lat               double precision NOT NULL,
+            lng               double precision NOT NULL,
+            location_name     text NOT NULL,
+            submitted_at      timestamptz NOT NULL,
+            validation_status text NOT NULL,
+            confidence        numeric,
+            reward_coins      int NOT NULL DEFAULT 0,
+            verified_at       timestamptz,
+            data              jsonb NOT NULL DEFAULT '{}'::jsonb
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS reports")
@@ -0,0 +1,34 @@
+"""Index YOLO results and validation status
+
+`jsonb_path_ops` only supports containment (`@>`), which is all the
+analytics queries need, and is much smaller than the default `jsonb_ops`.
+Queries must filter on the indexed expression itself, i.e.
+`data->'yolo_result' @> '{"detected_category": "water"}'`.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+"""
+
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS reports_yolo_gin "
+        "ON reports USING GIN ((data->'yolo_result') jsonb_path_ops)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS reports_status_btree "
+        "ON reports (validation_status)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS reports_status_btree")
+    op.execute("DROP INDEX IF EXISTS reports_yolo_gin")
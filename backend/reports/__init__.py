@@ -1,3 +1,4 @@
 from .processor import ReportProcessor
+from .worker import ValidationWorker
 
-__all__ = ['ReportProcessor']
+__all__ = ['ReportProcessor', 'ValidationWorker']
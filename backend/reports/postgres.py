@@ -0,0 +1,211 @@
+"""
+PostgreSQL Report Storage
+Report records live in a single `reports` table: fixed fields as columns,
+the flexible rest (YOLO output, validation reason, ...) in a JSONB `data`
+column. Aggregates are computed by the database instead of scanning records
+in Python, and every uvicorn worker sees the same reports.
+
+The schema is managed by Alembic (`migrations/`); run `alembic upgrade head`
+before starting the API.
+"""
+
+from datetime import timezone
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from psycopg import Connection, sql
+from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb, set_json_dumps, set_json_loads
+from psycopg_pool import ConnectionPool
+
+# Record field -> table column; every other record field is kept in `data`
+COLUMNS = {
+    "report_id": "report_id",
+    "category": "category",
+    "latitude": "lat",
+    "longitude": "lng",
+    "location_name": "location_name",
+    "submitted_at": "submitted_at",
+    "validation_status": "validation_status",
+    "confidence_score": "confidence",
+    "reward_coins": "reward_coins",
+    "verified_at": "verified_at",
+}
+
+INSERT_REPORT = sql.SQL(
+    "INSERT INTO reports ({columns}, data) VALUES ({values}, %s)"
+).format(
+    columns=sql.SQL(", ").join(map(sql.Identifier, COLUMNS.values())),
+    values=sql.SQL(", ").join(sql.Placeholder() * len(COLUMNS)),
+)
+
+SELECT_REPORT = sql.SQL(
+    "SELECT {columns}, data FROM reports WHERE report_id = %s"
+).format(columns=sql.SQL(", ").join(map(sql.Identifier, COLUMNS.values())))
+
+SELECT_VALIDATING = sql.SQL(
+    "SELECT report_id, submitted_at FROM reports WHERE validation_status = 'validating'"
+)
+
+# One round trip for both breakdowns
+SELECT_COUNTS = sql.SQL("""
+    SELECT
+        (SELECT jsonb_object_agg(validation_status, n)
+           FROM (SELECT validation_status, count(*) AS n FROM reports GROUP BY validation_status) s
+        ) AS statuses,
+        (SELECT jsonb_object_agg(category, n)
+           FROM (SELECT category, count(*) AS n FROM reports GROUP BY category) c
+        ) AS categories
+""")
+
+# Containment on the indexed expression, so reports_yolo_gin (jsonb_path_ops) is used
+COUNT_DETECTED = sql.SQL(
+    "SELECT count(*) AS n FROM reports WHERE data->'yolo_result' @> %s"
+)
+
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+def _configure_connection(conn: Connection) -> None:
+    """Serialize and parse JSONB with orjson instead of the stdlib json module"""
+    set_json_dumps(_orjson_dumps, context=conn)
+    set_json_loads(orjson.loads, context=conn)
+
+
+class PostgresReportStore:
+    """
+    Report storage backed by PostgreSQL.
+
+    Connections come from pools opened once per worker, so a submission
+    burst doesn't pay TCP and auth setup per report. Aggregate queries get
+    their own small pool so they can't starve inserts and status lookups.
+    Statements are prepared server-side so repeated lookups skip planning.
+    """
+
+    def __init__(self, conninfo: str, min_size: int = 4, max_size: int = 20, stats_pool_size: int = 2):
+        """
+        Args:
+            conninfo: PostgreSQL connection string (DATABASE_URL)
+            min_size: Connections kept open in the main pool
+            max_size: Upper bound for the main pool; keep the total across
+                      workers below the server's max_connections
+            stats_pool_size: Connections reserved for aggregate queries
+        """
+        kwargs = {"autocommit": True, "row_factory": dict_row}
+        self._pool = ConnectionPool(
+            conninfo, min_size=min_size, max_size=max_size, kwargs=kwargs,
+            configure=_configure_connection
+        )
+        self._stats_pool = ConnectionPool(
+            conninfo, min_size=1, max_size=stats_pool_size, kwargs=kwargs,
+            configure=_configure_connection
+        )
+
+    def insert_many(self, records: List[Dict]) -> List[Dict]:
+        """
+        Store several new report records in one pipelined round trip.
+
+        All-or-nothing, so a failed batch can be retried record by record.
+        """
+        if not records:
+            return records
+        rows = [self._to_row(record) for record in records]
+        with self._pool.connection() as conn, conn.transaction():
+            with conn.cursor() as cur:
+                cur.executemany(INSERT_REPORT, rows)
+        return records
+
+    def get(self, report_id: str) -> Optional[Dict]:
+        """Return the report record, or None if it doesn't exist"""
+        with self._pool.connection() as conn:
+            row = conn.execute(SELECT_REPORT, (report_id,), prepare=True).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def update(self, report_id: str, fields: Dict, expected_status: Optional[str] = None) -> bool:
+        """
+        Overwrite selected fields of an existing report.
+
+        With `expected_status`, only updates a report still in that status, so
+        concurrent workers can't both finalize it.
+
+        Returns:
+            Whether a report was updated
+        """
+        assignments = []
+        params = []
+        data = {}
+        for field, value in fields.items():
+            if field in COLUMNS:
+                assignments.append(sql.SQL("{} = %s").format(sql.Identifier(COLUMNS[field])))
+                params.append(value)
+            else:
+                data[field] = value
+        if data:
+            assignments.append(sql.SQL("data = data || %s"))
+            params.append(Jsonb(data))
+
+        query = sql.SQL("UPDATE reports SET {} WHERE report_id = %s").format(
+            sql.SQL(", ").join(assignments)
+        )
+        params.append(report_id)
+        if expected_status is not None:
+            query += sql.SQL(" AND validation_status = %s")
+            params.append(expected_status)
+        with self._pool.connection() as conn:
+            cur = conn.execute(query, params, prepare=True)
+        return cur.rowcount > 0
+
+    def validating(self) -> List[Tuple[str, str]]:
+        """Return (report_id, submitted_at) for every report still validating"""
+        with self._pool.connection() as conn:
+            rows = conn.execute(SELECT_VALIDATING, prepare=True).fetchall()
+        return [
+            (row["report_id"], row["submitted_at"].astimezone(timezone.utc).isoformat())
+            for row in rows
+        ]
+
+    def counts(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Aggregate report counts in the database.
+
+        Returns:
+            Tuple of (counts per validation status, counts per category)
+        """
+        with self._stats_pool.connection() as conn:
+            row = conn.execute(SELECT_COUNTS, prepare=True).fetchone()
+        return row["statuses"] or {}, row["categories"] or {}
+
+    def count_detected(self, detected_category: str) -> int:
+        """Count reports whose YOLO result detected `detected_category`"""
+        match = Jsonb({"detected_category": detected_category})
+        with self._stats_pool.connection() as conn:
+            row = conn.execute(COUNT_DETECTED, (match,), prepare=True).fetchone()
+        return row["n"]
+
+    def close(self) -> None:
+        """Close both connection pools"""
+        self._stats_pool.close()
+        self._pool.close()
+
+    @staticmethod
+    def _to_row(record: Dict) -> Tuple:
+        """Column values for INSERT_REPORT, with the remaining fields as JSONB"""
+        data = {k: v for k, v in record.items() if k not in COLUMNS}
+        return (*(record[field] for field in COLUMNS), Jsonb(data))
+
+    @staticmethod
+    def _to_record(row: Dict) -> Dict:
+        """Turn a table row back into the processor's record shape"""
+        record = dict(row.pop("data") or {})
+        for field, column in COLUMNS.items():
+            record[field] = row[column]
+
+        # Same UTC ISO strings the processor writes, whatever the session time zone
+        record["submitted_at"] = record["submitted_at"].astimezone(timezone.utc).isoformat()
+        if record["verified_at"] is not None:
+            record["verified_at"] = record["verified_at"].astimezone(timezone.utc).isoformat()
+        if record["confidence_score"] is not None:
+            record["confidence_score"] = float(record["confidence_score"])
+        return record
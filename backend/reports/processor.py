@@ -10,22 +10,78 @@ Validation Process:
 5. Expert review queue (when needed)
 """
 
-import uuid
+import base64
+import functools
 import json
+import os
 import random
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 import hashlib
 
+from .store import create_report_store
+
+# Standard base32 alphabet -> base32hex (0-9A-V), whose character order
+# matches byte order, so encoded IDs sort by their timestamp prefix
+_B32_TO_HEX = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ234567", b"0123456789ABCDEFGHIJKLMNOPQRSTUV")
+
+def _utc_iso(value) -> str:
+    """
+    Normalize a submission time to one ISO 8601 UTC string for every storage backend.
+    
+    Accepts a datetime or an ISO string; times without an offset are taken as UTC.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+@functools.lru_cache(maxsize=65536)
+def _hotspot_lookup(lat_q: int, lng_q: int) -> bool:
+    """
+    Hotspot check for one ~100m grid cell (coordinates in thousandths of a degree).
+    
+    Cached because submissions cluster around the same places; a cell is
+    looked up once per process.
+    """
+    # In production: query geospatial database
+    # For demo: random with 30% probability (stable per cell)
+    return random.random() < 0.3
+
 class ReportProcessor:
     """
     Processes citizen environmental reports through validation pipeline.
     """
     
-    def __init__(self):
-        """Initialize with in-memory storage (use database in production)"""
-        self.reports = {}  # In production: use PostgreSQL/MongoDB
+    # User-facing message per validation status
+    _STATUS_MESSAGES = {
+        "validating": "🔍 AI validation in progress. This usually takes a few seconds.",
+        "verified": "✅ Report verified! Your contribution helps monitor environmental conditions.",
+        "needs-review": "⏳ Report queued for expert review. This may take a few minutes.",
+        "rejected": "❌ Unable to verify this report. Consider resubmitting with clearer evidence."
+    }
+    
+    # Categories that earn the reward bonus
+    _PRIORITY_CATEGORIES = frozenset({"water", "construction"})
+    
+    # Upper bound of the estimated time a "validating" report waits for finalization
+    _MAX_VALIDATION_SECONDS = 15
+    
+    # Seconds a computed `get_report_stats` result is reused
+    _STATS_TTL_SECONDS = 5.0
+    
+    def __init__(self, database_url: Optional[str] = None):
+        """
+        Args:
+            database_url: PostgreSQL connection string; reports are kept in
+                          memory (per process, not durable) when omitted
+        """
+        self.store = create_report_store(database_url)
         self.validation_queue = []
+        self.pending = {}  # Accepted submissions waiting for background validation
+        self._stats_cache = (0.0, None)  # (computed at, stats); reset on writes
         
         # Validation thresholds
         self.confidence_thresholds = {
@@ -34,24 +90,99 @@ class ReportProcessor:
             "low": 0.30        # Likely reject
         }
     
-    def process_submission(self, report_data: Dict) -> Dict:
+    def accept_submission(self, report_data: Dict) -> Dict:
+        """
+        Register a submission for background validation and return its tracking ID.
+        
+        The report is reported as "validating" until `process_batch` picks it up.
+        
+        Args:
+            report_data: Same fields as `process_submission`
+        
+        Returns:
+            Dictionary with report ID, status, and validation info
+        """
+        report_id = self._generate_report_id()
+        
+        self.pending[report_id] = {
+            "category": report_data["category"],
+            "location_name": report_data["location_name"],
+            "submitted_at": _utc_iso(report_data["timestamp"])
+        }
+        
+        return {
+            "report_id": report_id,
+            "status": "submitted",
+            "validation_status": "validating",
+            "estimated_verification_time": self._estimate_verification_time("validating"),
+            "message": self._get_status_message("validating")
+        }
+    
+    def process_batch(self, reports: List[Dict], images: Optional[List[Optional[bytes]]] = None) -> List[Dict]:
+        """
+        Validate several submissions and store them with one bulk insert.
+        
+        Args:
+            reports: List of `report_data` dictionaries (see `process_submission`);
+                     entries registered with `accept_submission` carry their `report_id`
+            images: Raw image bytes per report, or None
+        
+        Returns:
+            List of submission results, in the same order as `reports`
+        """
+        images = images or [None] * len(reports)
+        records = [
+            self._build_record(report_data, image_data)
+            for report_data, image_data in zip(reports, images)
+        ]
+        
+        # Store reports (then drop the pending entries, so status lookups always find them)
+        self.store.insert_many(records)
+        self._stats_cache = (0.0, None)
+        
+        results = []
+        for record in records:
+            report_id = record["report_id"]
+            status = record["validation_status"]
+            self.pending.pop(report_id, None)
+            
+            # If needs review, add to queue
+            if status == "needs-review":
+                self.validation_queue.append(report_id)
+            
+            results.append({
+                "report_id": report_id,
+                "status": "submitted",
+                "validation_status": status,
+                "estimated_verification_time": self._estimate_verification_time(status),
+                "message": self._get_status_message(status)
+            })
+        
+        return results
+    
+    def process_submission(self, report_data: Dict, image_data: Optional[bytes] = None) -> Dict:
         """
         Process a new report submission.
         
         Args:
             report_data: Dictionary containing:
-                - image_data (optional): Base64 encoded image
+                - report_id (optional): ID assigned by `accept_submission`
                 - category: User-selected category
                 - latitude, longitude: Location coordinates
                 - location_name: Human-readable location
                 - yolo_result: YOLO detection output
                 - timestamp: Submission time
+            image_data: Raw evidence image bytes (optional)
         
         Returns:
             Dictionary with report ID, status, and validation info
         """
-        # Generate unique report ID
-        report_id = self._generate_report_id()
+        return self.process_batch([report_data], [image_data])[0]
+    
+    def _build_record(self, report_data: Dict, image_data: Optional[bytes]) -> Dict:
+        """Run the validation decision for one submission and build its report record"""
+        # Use the ID handed out at submission time, or generate a new one
+        report_id = report_data.get("report_id") or self._generate_report_id()
         
         # Extract YOLO confidence
         yolo_confidence = 0.0
@@ -65,39 +196,104 @@ class ReportProcessor:
             location=(report_data["latitude"], report_data["longitude"])
         )
         
-        # Create report record
-        report_record = {
+        return {
             "report_id": report_id,
             "category": report_data["category"],
             "latitude": report_data["latitude"],
             "longitude": report_data["longitude"],
             "location_name": report_data["location_name"],
             "yolo_result": report_data.get("yolo_result"),
-            "submitted_at": report_data["timestamp"],
+            "has_image": image_data is not None,
+            "submitted_at": _utc_iso(report_data["timestamp"]),
             "validation_status": validation_decision["status"],
             "validation_reason": validation_decision["reason"],
             "confidence_score": validation_decision["confidence"],
             "verified_at": None,
             "reward_coins": 0
         }
+    
+    def reject_submission(self, report_data: Dict, image_data: Optional[bytes], reason: str) -> None:
+        """
+        Store an accepted submission that couldn't be validated as rejected.
         
-        # Store report
-        self.reports[report_id] = report_record
+        The pending entry is dropped even if storing fails, so the report
+        never stays "validating" (status lookups then report it as not found).
         
-        # If needs review, add to queue
-        if validation_decision["status"] == "needs-review":
-            self.validation_queue.append(report_id)
+        Args:
+            report_data: Report fields, including the `report_id` from `accept_submission`
+            image_data: Raw evidence image bytes (optional)
+            reason: Validation reason shown to the user
+        """
+        try:
+            self.store.insert_many([{
+                "report_id": report_data["report_id"],
+                "category": report_data["category"],
+                "latitude": report_data["latitude"],
+                "longitude": report_data["longitude"],
+                "location_name": report_data["location_name"],
+                "yolo_result": None,  # Unusable; likely why validation failed
+                "has_image": image_data is not None,
+                "submitted_at": _utc_iso(report_data["timestamp"]),
+                "validation_status": "rejected",
+                "validation_reason": reason,
+                "confidence_score": 0.0,
+                "verified_at": None,
+                "reward_coins": 0
+            }])
+            self._stats_cache = (0.0, None)
+        finally:
+            self.pending.pop(report_data["report_id"], None)
+    
+    def finalize_validation(self, report_id: str) -> Optional[str]:
+        """
+        Move a report out of "validating" once its validation has run.
         
-        # Simulate async processing time
-        estimated_time = self._estimate_verification_time(validation_decision["status"])
+        Called by the background worker after the estimated verification
+        time; writes the outcome (and reward, if verified) in one update.
         
-        return {
-            "report_id": report_id,
-            "status": "submitted",
-            "validation_status": validation_decision["status"],
-            "estimated_verification_time": estimated_time,
-            "message": self._get_status_message(validation_decision["status"])
+        Args:
+            report_id: Unique report identifier
+        
+        Returns:
+            The new status, or None if the report isn't validating
+        """
+        report = self.store.get(report_id)
+        if report is None or report["validation_status"] != "validating":
+            return None
+        
+        # Simulate validation progression
+        # In production, this would track actual validation pipeline
+        status = self._simulate_validation_completion(report)
+        fields = {
+            "validation_status": status,
+            "reward_coins": report["reward_coins"],
+            "verified_at": None
         }
+        if status == "verified":
+            fields["reward_coins"] = self._calculate_reward(report)
+            fields["verified_at"] = datetime.now(timezone.utc).isoformat()
+        
+        # Conditional, so a report another worker already finalized is left alone
+        if not self.store.update(report_id, fields, expected_status="validating"):
+            return None
+        self._stats_cache = (0.0, None)
+        return status
+    
+    def overdue_validations(self) -> List[Tuple[str, float]]:
+        """
+        Find stored reports still "validating", e.g. after a restart lost their timers.
+        
+        Returns:
+            List of (report_id, seconds until its validation is due; 0 if overdue)
+        """
+        now = datetime.now(timezone.utc)
+        due = []
+        for report_id, submitted_at in self.store.validating():
+            elapsed = (now - datetime.fromisoformat(submitted_at)).total_seconds()
+            remaining = self._MAX_VALIDATION_SECONDS - elapsed
+            # Clamped: a client clock running ahead shouldn't postpone it further
+            due.append((report_id, min(max(remaining, 0.0), self._MAX_VALIDATION_SECONDS)))
+        return due
     
     def get_status(self, report_id: str) -> Dict:
         """
@@ -109,26 +305,29 @@ class ReportProcessor:
         Returns:
             Dictionary with current status, progress, and reward info
         """
-        if report_id not in self.reports:
+        queued = self.pending.get(report_id)
+        if queued is not None:
+            # Accepted but not yet picked up by the background validator
+            return {
+                "report_id": report_id,
+                "status": "validating",
+                "category": queued["category"],
+                "location": queued["location_name"],
+                "submitted_at": queued["submitted_at"],
+                "verified_at": None,
+                "confidence_score": None,
+                "validation_reason": "Queued for AI-assisted validation.",
+                "reward_coins": 0,
+                "message": self._get_status_message("validating")
+            }
+        
+        report = self.store.get(report_id)
+        if report is None:
             raise ValueError(f"Report {report_id} not found")
         
-        report = self.reports[report_id]
-        
-        # Simulate validation progression
-        # In production, this would track actual validation pipeline
+        # Read-only: status transitions happen in `finalize_validation`
         status = report["validation_status"]
-        
-        # If validating, randomly progress to final state (for demo)
-        if status == "validating":
-            status = self._simulate_validation_completion(report)
-            report["validation_status"] = status
-        
-        # Calculate reward
-        reward = 0
-        if status == "verified":
-            reward = self._calculate_reward(report)
-            report["reward_coins"] = reward
-            report["verified_at"] = datetime.now().isoformat()
+        reward = report["reward_coins"]
         
         return {
             "report_id": report_id,
@@ -208,9 +407,8 @@ class ReportProcessor:
     
     def _is_known_hotspot(self, lat: float, lng: float) -> bool:
         """Check if location is a known pollution hotspot (simulated)"""
-        # In production: query geospatial database
-        # For demo: random with 30% probability
-        return random.random() < 0.3
+        # Quantize to ~100m cells so nearby GPS fixes share one cached lookup
+        return _hotspot_lookup(round(lat * 1000), round(lng * 1000))
     
     def _simulate_validation_completion(self, report: Dict) -> str:
         """
@@ -243,8 +441,7 @@ class ReportProcessor:
         confidence_bonus = 5 if report["confidence_score"] >= 0.8 else 0
         
         # High-priority category bonus
-        priority_categories = ["water", "construction"]
-        category_bonus = 5 if report["category"] in priority_categories else 0
+        category_bonus = 5 if report["category"] in self._PRIORITY_CATEGORIES else 0
         
         # Random location bonus (simulates underreported area)
         location_bonus = 5 if random.random() < 0.3 else 0
@@ -260,44 +457,54 @@ class ReportProcessor:
         elif status == "needs-review":
             return random.randint(10, 30)
         else:
-            return random.randint(5, 15)
+            return random.randint(5, self._MAX_VALIDATION_SECONDS)
     
     def _get_status_message(self, status: str) -> str:
         """Get user-friendly status message"""
-        messages = {
-            "validating": "🔍 AI validation in progress. This usually takes a few seconds.",
-            "verified": "✅ Report verified! Your contribution helps monitor environmental conditions.",
-            "needs-review": "⏳ Report queued for expert review. This may take a few minutes.",
-            "rejected": "❌ Unable to verify this report. Consider resubmitting with clearer evidence."
-        }
-        return messages.get(status, "Processing your report...")
+        return self._STATUS_MESSAGES.get(status, "Processing your report...")
     
     def _generate_report_id(self) -> str:
-        """Generate unique report ID"""
-        # Combine timestamp and random UUID
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        return f"RPT-{timestamp}-{unique_id}"
+        """
+        Generate unique, time-sortable report ID (ULID-style).
+        
+        48-bit millisecond timestamp followed by 80 random bits, base32-encoded;
+        new IDs sort after older ones, so primary key inserts stay append-only.
+        """
+        millis = time.time_ns() // 1_000_000
+        raw = millis.to_bytes(6, "big") + os.urandom(10)
+        return "RPT-" + base64.b32encode(raw).translate(_B32_TO_HEX).decode().rstrip("=")
     
     # ========================================================================
     # ANALYTICS HELPERS
     # ========================================================================
     
     def get_report_stats(self) -> Dict:
-        """Get aggregate statistics on reports"""
-        total = len(self.reports)
+        """
+        Get aggregate statistics on reports.
+        
+        Dashboards poll this far more often than reports change, so a result
+        is reused for `_STATS_TTL_SECONDS` or until this worker stores a
+        report or changes a status.
+        """
+        now = time.monotonic()
+        computed_at, cached = self._stats_cache
+        if cached is not None and now - computed_at < self._STATS_TTL_SECONDS:
+            return cached
+        
+        stats = self._compute_stats()
+        self._stats_cache = (now, stats)
+        return stats
+    
+    def _compute_stats(self) -> Dict:
+        """Aggregate report counts from storage"""
+        status_counts, categories = self.store.counts()
+        total = sum(categories.values())
         if total == 0:
             return {"total": 0}
         
-        verified = sum(1 for r in self.reports.values() if r["validation_status"] == "verified")
-        pending = sum(1 for r in self.reports.values() if r["validation_status"] == "needs-review")
-        rejected = sum(1 for r in self.reports.values() if r["validation_status"] == "rejected")
-        
-        # Category breakdown
-        categories = {}
-        for report in self.reports.values():
-            cat = report["category"]
-            categories[cat] = categories.get(cat, 0) + 1
+        verified = status_counts.get("verified", 0)
+        pending = status_counts.get("needs-review", 0)
+        rejected = status_counts.get("rejected", 0)
         
         return {
             "total": total,
@@ -307,3 +514,7 @@ class ReportProcessor:
             "verification_rate": round(verified / total * 100, 1) if total > 0 else 0,
             "categories": categories
         }
+    
+    def close(self) -> None:
+        """Release storage resources (database connections)"""
+        self.store.close()
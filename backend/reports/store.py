@@ -0,0 +1,97 @@
+"""
+Report Storage
+Keeps report records behind a small interface so the processor doesn't care
+where they live: a per-process dict for local development, PostgreSQL when
+DATABASE_URL is configured.
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+class InMemoryReportStore:
+    """
+    Dict-backed report storage.
+
+    Records are lost on restart and not shared between uvicorn workers;
+    use `PostgresReportStore` for anything beyond a single local process.
+    """
+
+    def __init__(self):
+        self.reports: Dict[str, Dict] = {}
+
+    def insert_many(self, records: List[Dict]) -> List[Dict]:
+        """Store several new report records and return them"""
+        for record in records:
+            self.reports[record["report_id"]] = record
+        return records
+
+    def get(self, report_id: str) -> Optional[Dict]:
+        """Return the report record, or None if it doesn't exist"""
+        return self.reports.get(report_id)
+
+    def update(self, report_id: str, fields: Dict, expected_status: Optional[str] = None) -> bool:
+        """
+        Overwrite selected fields of an existing report.
+
+        With `expected_status`, only updates a report still in that status.
+
+        Returns:
+            Whether a report was updated
+        """
+        report = self.reports.get(report_id)
+        if report is None or (expected_status is not None and report["validation_status"] != expected_status):
+            return False
+        report.update(fields)
+        return True
+
+    def validating(self) -> List[Tuple[str, str]]:
+        """Return (report_id, submitted_at) for every report still validating"""
+        return [
+            (report_id, report["submitted_at"])
+            for report_id, report in self.reports.items()
+            if report["validation_status"] == "validating"
+        ]
+
+    def counts(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Aggregate report counts.
+
+        Returns:
+            Tuple of (counts per validation status, counts per category)
+        """
+        # Both breakdowns in a single pass over the records
+        status_counts = Counter()
+        categories = Counter()
+        for report in self.reports.values():
+            status_counts[report["validation_status"]] += 1
+            categories[report["category"]] += 1
+
+        return dict(status_counts), dict(categories)
+
+    def count_detected(self, detected_category: str) -> int:
+        """Count reports whose YOLO result detected `detected_category`"""
+        return sum(
+            1 for r in self.reports.values()
+            if (r.get("yolo_result") or {}).get("detected_category") == detected_category
+        )
+
+    def close(self) -> None:
+        """Nothing to release for in-memory storage"""
+
+
+def create_report_store(database_url: Optional[str] = None):
+    """
+    Pick the storage backend for the report processor.
+
+    Args:
+        database_url: PostgreSQL connection string; in-memory storage when empty
+
+    Returns:
+        `PostgresReportStore` or `InMemoryReportStore`
+    """
+    if database_url:
+        # Imported lazily so psycopg is only required when a database is configured
+        from .postgres import PostgresReportStore
+        return PostgresReportStore(database_url)
+    return InMemoryReportStore()
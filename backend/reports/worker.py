@@ -0,0 +1,205 @@
+"""
+Background Report Validation
+Takes report validation off the request path: submissions are acknowledged
+with a tracking ID immediately and validated later in small batches. Reports
+still "validating" after that are finalized in the background once their
+estimated verification time has passed, so status lookups never write.
+Reports left "validating" by a previous run are picked up again on start.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Set, Tuple
+
+from .processor import ReportProcessor
+
+logger = logging.getLogger(__name__)
+
+# Queued by `stop()`: validate everything ahead of it, then exit
+_STOP = object()
+
+
+class ValidationWorker:
+    """
+    Queues accepted submissions and validates them in batches.
+
+    A background task waits for the first queued submission, then keeps
+    collecting until `max_batch_size` are waiting or `max_wait` seconds have
+    passed. Submissions that include an image but no YOLO result are first
+    analyzed through the shared batch scheduler, then the whole batch goes
+    through `ReportProcessor.process_batch` in the executor. Reports left
+    "validating" get a timer that runs `ReportProcessor.finalize_validation`.
+    """
+
+    def __init__(self, processor: ReportProcessor, batch_scheduler=None,
+                 executor: Optional[Executor] = None, max_batch_size: int = 16, max_wait: float = 0.05):
+        """
+        Args:
+            processor: Report processor that stores and validates reports
+            batch_scheduler: Optional `yolo.BatchScheduler` for server-side image analysis
+            executor: Pool that runs validation off the event loop
+            max_batch_size: Maximum number of submissions per batch
+            max_wait: Seconds to wait for more submissions once a batch has started
+        """
+        self.processor = processor
+        self.batch_scheduler = batch_scheduler
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._finalizing: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the background validation task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Validate every acknowledged submission still queued, then stop.
+
+        Reports waiting on a finalization timer are finalized right away, so
+        none are left "validating" once the process exits. Call before
+        stopping the batch scheduler, which queued images still need, and
+        before shutting down the executor.
+        """
+        if self._task is not None:
+            # Submissions were acknowledged, so finish them instead of cancelling
+            self.queue.put_nowait(_STOP)
+            await self._task
+            self._task = None
+
+        for report_id, handle in list(self._timers.items()):
+            handle.cancel()
+            self._start_finalize(report_id)
+
+        await asyncio.gather(*self._finalizing)
+
+    def submit(self, report_data: Dict, image_data: Optional[bytes] = None) -> Dict:
+        """
+        Accept a submission and queue it for validation.
+
+        Args:
+            report_data: Report fields (see `ReportProcessor.process_submission`)
+            image_data: Raw evidence image bytes (optional)
+
+        Returns:
+            Submission acknowledgement with the tracking report ID
+        """
+        ack = self.processor.accept_submission(report_data)
+        self.queue.put_nowait(({**report_data, "report_id": ack["report_id"]}, image_data))
+        return ack
+
+    async def run(self) -> None:
+        """Collect queued submissions into batches and validate them until `stop()`"""
+        loop = asyncio.get_running_loop()
+        await self._resume_validations()
+
+        while True:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stopping = False
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._validate(batch)
+            if stopping:
+                return
+
+    async def _validate(self, batch: List[Tuple[Dict, Optional[bytes]]]) -> None:
+        """Analyze missing images, then validate one batch in the executor"""
+        reports = [report_data for report_data, _ in batch]
+        images = [image_data for _, image_data in batch]
+
+        if self.batch_scheduler is not None:
+            await asyncio.gather(*(
+                self._analyze_image(report_data, image_data)
+                for report_data, image_data in batch
+                if image_data is not None and not report_data.get("yolo_result")
+            ))
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.processor.process_batch, reports, images)
+        except Exception:
+            # Retry one by one so a single bad submission doesn't block the rest
+            results = []
+            for report_data, image_data in batch:
+                try:
+                    results += await loop.run_in_executor(
+                        self.executor, self.processor.process_batch, [report_data], [image_data]
+                    )
+                except Exception:
+                    logger.exception("Validation failed for report %s", report_data["report_id"])
+                    await self._reject(report_data, image_data)
+
+        for result in results:
+            if result["validation_status"] == "validating":
+                self._timers[result["report_id"]] = loop.call_later(
+                    result["estimated_verification_time"], self._start_finalize, result["report_id"]
+                )
+
+    async def _reject(self, report_data: Dict, image_data: Optional[bytes]) -> None:
+        """Store a submission that failed validation as rejected instead of leaving it pending"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self.executor, self.processor.reject_submission, report_data, image_data,
+                "Report could not be validated. Please resubmit."
+            )
+        except Exception:
+            logger.exception("Could not record failed validation for report %s", report_data["report_id"])
+
+    async def _resume_validations(self) -> None:
+        """Schedule finalization for stored reports still "validating" after a restart or crash"""
+        loop = asyncio.get_running_loop()
+        try:
+            overdue = await loop.run_in_executor(self.executor, self.processor.overdue_validations)
+        except Exception:
+            logger.exception("Could not look up reports left validating")
+            return
+
+        for report_id, delay in overdue:
+            if delay > 0:
+                self._timers[report_id] = loop.call_later(delay, self._start_finalize, report_id)
+            else:
+                self._start_finalize(report_id)
+
+    def _start_finalize(self, report_id: str) -> None:
+        """Timer callback: run the finalization as a tracked task"""
+        self._timers.pop(report_id, None)
+        task = asyncio.create_task(self._finalize(report_id))
+        self._finalizing.add(task)
+        task.add_done_callback(self._finalizing.discard)
+
+    async def _finalize(self, report_id: str) -> None:
+        """Write a validating report's final status from the executor"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.processor.finalize_validation, report_id)
+        except Exception:
+            logger.exception("Finalizing validation failed for report %s", report_id)
+
+    async def _analyze_image(self, report_data: Dict, image_data: bytes) -> None:
+        """Fill in `yolo_result` from the batch scheduler; leave it empty if analysis fails"""
+        try:
+            report_data["yolo_result"] = await self.batch_scheduler.submit(image_data)
+        except Exception:
+            logger.warning("Image analysis failed for report %s", report_data["report_id"])
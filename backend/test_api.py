@@ -7,15 +7,25 @@ import requests
 import json
 from io import BytesIO
 from PIL import Image
-import base64
 
 # Configuration
 BASE_URL = "http://localhost:8000"
 
+# One keep-alive connection shared by all tests
+session = requests.Session()
+
+def _make_test_jpeg() -> bytes:
+    """Encode the 640x480 test image (done once, reused by every upload)"""
+    img_buffer = BytesIO()
+    Image.new('RGB', (640, 480), color=(73, 109, 137)).save(img_buffer, format='JPEG')
+    return img_buffer.getvalue()
+
+TEST_JPEG = _make_test_jpeg()
+
 def test_health_check():
     """Test 1: Health check endpoint"""
     print("\n🔍 Test 1: Health Check")
-    response = requests.get(f"{BASE_URL}/")
+    response = session.get(f"{BASE_URL}/")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
     assert response.status_code == 200
@@ -24,7 +34,7 @@ def test_health_check():
 def test_current_aqi():
     """Test 2: Current AQI data"""
     print("\n🔍 Test 2: Current AQI")
-    response = requests.get(f"{BASE_URL}/api/aqi/current?city=Delhi")
+    response = session.get(f"{BASE_URL}/api/aqi/current?city=Delhi")
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Response: {json.dumps(data, indent=2)}")
@@ -36,7 +46,7 @@ def test_current_aqi():
 def test_aqi_history():
     """Test 3: AQI history"""
     print("\n🔍 Test 3: AQI History (24h)")
-    response = requests.get(f"{BASE_URL}/api/aqi/history?city=Delhi&range=24h")
+    response = session.get(f"{BASE_URL}/api/aqi/history?city=Delhi&range=24h")
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Number of data points: {len(data)}")
@@ -49,7 +59,7 @@ def test_aqi_history():
 def test_cities_aqi():
     """Test 4: All cities AQI"""
     print("\n🔍 Test 4: All Cities AQI")
-    response = requests.get(f"{BASE_URL}/api/cities")
+    response = session.get(f"{BASE_URL}/api/cities")
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Number of cities: {len(data)}")
@@ -64,15 +74,9 @@ def test_image_analysis():
     """Test 5: Image analysis (YOLO)"""
     print("\n🔍 Test 5: Image Analysis")
     
-    # Create a simple test image
-    img = Image.new('RGB', (640, 480), color=(73, 109, 137))
-    img_buffer = BytesIO()
-    img.save(img_buffer, format='JPEG')
-    img_buffer.seek(0)
-    
-    # Upload image
-    files = {'file': ('test.jpg', img_buffer, 'image/jpeg')}
-    response = requests.post(f"{BASE_URL}/api/report/analyze-image", files=files)
+    # Upload the shared test image
+    files = {'file': ('test.jpg', BytesIO(TEST_JPEG), 'image/jpeg')}
+    response = session.post(f"{BASE_URL}/api/report/analyze-image", files=files)
     
     print(f"Status: {response.status_code}")
     data = response.json()
@@ -95,16 +99,19 @@ def test_report_submission():
         "latitude": 28.6139,
         "longitude": 77.2090,
         "location_name": "Connaught Place, Delhi",
-        "yolo_result": {
+        "yolo_result": json.dumps({
             "detected_category": "construction",
             "confidence": 0.87
-        },
+        }),
         "timestamp": "2026-02-16T10:30:00"
     }
     
-    response = requests.post(
+    # Evidence image is sent as raw binary alongside the form fields
+    files = {'file': ('report.jpg', BytesIO(TEST_JPEG), 'image/jpeg')}
+    response = session.post(
         f"{BASE_URL}/api/report/submit",
-        json=report
+        data=report,
+        files=files
     )
     
     print(f"Status: {response.status_code}")
@@ -117,11 +124,36 @@ def test_report_submission():
     # Store report_id for next test
     return data["report_id"]
 
+def test_report_batch_submission():
+    """Test 6b: Bulk report submission"""
+    print("\n🔍 Test 6b: Bulk Report Submission")
+    
+    reports = [
+        {
+            "category": category,
+            "latitude": 28.6139,
+            "longitude": 77.2090,
+            "location_name": "Connaught Place, Delhi",
+            "yolo_result": {"detected_category": category, "confidence": 0.8},
+            "timestamp": "2026-02-16T10:30:00"
+        }
+        for category in ("air", "garbage", "construction", "water")
+    ]
+    
+    response = session.post(f"{BASE_URL}/api/report/submit-batch", json=reports)
+    print(f"Status: {response.status_code}")
+    data = response.json()
+    print(f"Report IDs: {[r['report_id'] for r in data]}")
+    
+    assert response.status_code == 200
+    assert len(data) == len(reports)
+    print("✅ Bulk report submission passed")
+
 def test_report_status(report_id):
     """Test 7: Report status check"""
     print("\n🔍 Test 7: Report Status")
     
-    response = requests.get(f"{BASE_URL}/api/report/status/{report_id}")
+    response = session.get(f"{BASE_URL}/api/report/status/{report_id}")
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Response: {json.dumps(data, indent=2)}")
@@ -134,7 +166,7 @@ def test_insights():
     """Test 8: AI insights"""
     print("\n🔍 Test 8: AI Insights")
     
-    response = requests.get(f"{BASE_URL}/api/insights/aqi?city=Delhi")
+    response = session.get(f"{BASE_URL}/api/insights/aqi?city=Delhi")
     print(f"Status: {response.status_code}")
     data = response.json()
     print(f"Insight: {data['insight']}")
@@ -161,6 +193,7 @@ def run_all_tests():
         # Image and report tests
         test_image_analysis()
         report_id = test_report_submission()
+        test_report_batch_submission()
         test_report_status(report_id)
         
         # Insights
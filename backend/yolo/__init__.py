@@ -1,3 +1,4 @@
 from .detector import YOLODetector
+from .batching import BatchScheduler
 
-__all__ = ['YOLODetector']
+__all__ = ['YOLODetector', 'BatchScheduler']
@@ -0,0 +1,120 @@
+"""
+Dynamic Micro-Batching for YOLO Inference
+Collects concurrent image analysis requests into small batches so the model
+runs once per batch instead of once per request.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .detector import YOLODetector
+
+
+class BatchScheduler:
+    """
+    Queues images from concurrent requests and runs them through the detector in batches.
+
+    A background task waits for the first queued image, then keeps collecting
+    until either `max_batch_size` images are waiting or `max_wait` seconds have
+    passed. Each request gets its own Future, resolved when its batch finishes.
+    """
+
+    def __init__(self, detector: YOLODetector, max_batch_size: int = 8, max_wait: float = 0.02,
+                 executor: Optional[Executor] = None):
+        """
+        Args:
+            detector: Detector providing `analyze` and `analyze_batch`
+            max_batch_size: Maximum number of images per inference call
+            max_wait: Seconds to wait for more images once a batch has started
+            executor: Pool that runs inference off the event loop
+                      (defaults to the loop's default executor)
+        """
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background batching task on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Cancel the background task and fail any requests still waiting"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batch scheduler stopped"))
+
+    async def submit(self, image_data: bytes) -> Dict:
+        """
+        Queue an image for analysis and wait for its result.
+
+        Args:
+            image_data: Raw image bytes
+
+        Returns:
+            Detection result dictionary (same shape as `YOLODetector.analyze`)
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((image_data, future))
+        return await future
+
+    async def run(self) -> None:
+        """Collect queued images into batches and dispatch them until cancelled"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[bytes, asyncio.Future]]) -> None:
+        """Run one batch through the detector and resolve each request's Future"""
+        images = [image_data for image_data, _ in batch]
+
+        try:
+            results = await self._run_blocking(self.detector.analyze_batch, images)
+        except Exception:
+            # A single unreadable image fails the whole batch; fall back to
+            # per-image analysis so the error only reaches its own request
+            results = []
+            for image_data in images:
+                try:
+                    results.append(await self._run_blocking(self.detector.analyze, image_data))
+                except Exception as e:
+                    results.append(e)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # Client went away while the batch was running
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _run_blocking(self, func: Callable, *args):
+        """Run blocking detector code in the executor so the event loop stays free"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
@@ -3,12 +3,43 @@ YOLO-based Environmental Object Detection
 Provides AI-assisted preliminary classification with explainable confidence scores
 """
 
+import ast
 import io
-import random
+import itertools
+import re
+from types import MappingProxyType
 from PIL import Image
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
 
+# Environmental categories; read-only views so every detector shares one copy
+_CATEGORIES = MappingProxyType({
+    "air": MappingProxyType({
+        "keywords": ("vehicle", "car", "truck", "bus", "motorcycle", "smoke", "exhaust", "traffic"),
+        "description": "Air pollution indicators (vehicles, smoke, industrial activity)"
+    }),
+    "garbage": MappingProxyType({
+        "keywords": ("trash", "garbage", "waste", "litter", "dump", "plastic"),
+        "description": "Waste and garbage accumulation"
+    }),
+    "construction": MappingProxyType({
+        "keywords": ("construction", "dust", "building", "excavation", "crane", "machinery"),
+        "description": "Construction dust and site pollution"
+    }),
+    "water": MappingProxyType({
+        "keywords": ("water", "river", "lake", "sewage", "drain", "algae"),
+        "description": "Water pollution and contamination"
+    })
+})
+
+# Common objects detectable by YOLO
+_ENV_OBJECTS = (
+    "vehicle", "truck", "car", "motorcycle", "bus",
+    "person", "plastic_bag", "bottle", "container",
+    "construction_equipment", "building", "tree",
+    "water_body", "road", "dust_cloud"
+)
+
 class YOLODetector:
     """
     Simulated YOLO detector for environmental issue classification.
@@ -19,43 +50,77 @@ class YOLODetector:
     - Real-time inference on GPU
     
     For demo purposes, this provides realistic simulation with explainable outputs.
+    Given an exported YOLOv8 ONNX model (ideally INT8-quantized), inference
+    runs on ONNX Runtime instead.
     """
     
-    def __init__(self):
-        """Initialize detector with environmental categories"""
-        self.categories = {
-            "air": {
-                "keywords": ["vehicle", "car", "truck", "smoke", "exhaust", "traffic"],
-                "description": "Air pollution indicators (vehicles, smoke, industrial activity)"
-            },
-            "garbage": {
-                "keywords": ["trash", "garbage", "waste", "litter", "dump", "plastic"],
-                "description": "Waste and garbage accumulation"
-            },
-            "construction": {
-                "keywords": ["construction", "dust", "building", "excavation", "crane", "machinery"],
-                "description": "Construction dust and site pollution"
-            },
-            "water": {
-                "keywords": ["water", "river", "lake", "sewage", "drain", "algae"],
-                "description": "Water pollution and contamination"
-            }
-        }
+    # Environmental categories and detectable objects (read-only, shared)
+    categories = _CATEGORIES
+    environmental_objects = _ENV_OBJECTS
+    
+    # Category order of score vectors
+    _CATEGORY_KEYS = tuple(categories)
+    
+    # Objects reported per detected category
+    _OBJECT_POOLS = {
+        "air": ("vehicle", "truck", "car", "motorcycle", "smoke", "traffic"),
+        "garbage": ("plastic_bag", "bottle", "trash_pile", "waste_container", "litter"),
+        "construction": ("construction_equipment", "dust_cloud", "building", "crane", "excavation"),
+        "water": ("water_body", "sewage", "drain", "algae_growth", "contamination")
+    }
+    
+    # Every possible detected-object list per category and object count
+    _OBJECT_SUBSETS = {
+        category: {k: tuple(itertools.combinations(pool, k)) for k in (2, 3, 4)}
+        for category, pool in _OBJECT_POOLS.items()
+    }
+    
+    # Category-specific explanations ({conf}: confidence level, {objs}: detected objects)
+    _EXPLANATION_TEMPLATES = {
+        "air": "{conf} detection of air pollution indicators. Detected: {objs}. "
+               "This suggests vehicular or industrial emissions. AI recommendation: verify with citizen observation.",
+        
+        "garbage": "{conf} detection of waste accumulation. Identified: {objs}. "
+                   "Visible garbage and litter patterns detected. Recommendation: cross-reference with location history.",
+        
+        "construction": "{conf} detection of construction-related pollution. Found: {objs}. "
+                        "Construction activity and dust generation indicators present. Consider time of day and weather context.",
+        
+        "water": "{conf} detection of water pollution indicators. Detected: {objs}. "
+                 "Water quality concerns visible. Requires field verification for contamination assessment."
+    }
+    
+    # Appended to explanations for low scores
+    _LOW_CONFIDENCE_NOTE = " ⚠️ Lower confidence suggests ambiguous visual conditions or mixed environmental factors."
+    
+    # Minimum class score for an ONNX detection to count
+    _ONNX_CONF_THRESHOLD = 0.25
+    
+    # `detected_category` when the model finds nothing that maps to a category
+    _NO_DETECTION = "none"
+    
+    def __init__(self, model_path: Optional[str] = None):
+        """
+        Args:
+            model_path: Path to a YOLOv8 ONNX model; inference is simulated when omitted
+        """
+        # No real model is loaded; inference is simulated
+        self.simulated = True
+        if model_path:
+            self._load_onnx_model(model_path)
         
-        # Common objects detectable by YOLO
-        self.environmental_objects = [
-            "vehicle", "truck", "car", "motorcycle", "bus",
-            "person", "plastic_bag", "bottle", "container",
-            "construction_equipment", "building", "tree",
-            "water_body", "road", "dust_cloud"
-        ]
+        # One generator for all simulated draws; category scores (in
+        # `_CATEGORY_KEYS` order) are Dirichlet-distributed with means
+        # of roughly 0.33 / 0.22 / 0.28 / 0.17
+        self._rng = np.random.default_rng()
+        self._dirichlet_alpha = np.array([3.0, 2.0, 2.5, 1.5])
     
     def analyze(self, image_data: bytes) -> Dict:
         """
         Analyze image for environmental issues.
         
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes (any buffer, e.g. bytes or memoryview)
             
         Returns:
             Dictionary with:
@@ -67,17 +132,155 @@ class YOLODetector:
         """
         try:
             # Load and process image
-            image = Image.open(io.BytesIO(image_data))
-            width, height = image.size
+            image = self._open_image(image_data)
             
-            # Simulate YOLO inference
-            # In production: model.predict(image)
+            # Run the ONNX model, or simulate YOLO inference without one
+            if not self.simulated:
+                return self._onnx_detection([image])[0]
             result = self._simulate_detection(image)
             
             return result
             
         except Exception as e:
             raise ValueError(f"Image processing failed: {str(e)}")
+
+    def analyze_batch(self, images: List[bytes]) -> List[Dict]:
+        """
+        Analyze several images in one inference call.
+
+        Args:
+            images: List of raw image buffers (bytes or memoryview)
+
+        Returns:
+            List of result dictionaries, in the same order as `images`
+        """
+        try:
+            # Decode the whole batch up front
+            decoded = [self._open_image(image_data) for image_data in images]
+
+            # One forward pass for the batch, or simulated inference
+            if not self.simulated:
+                return self._onnx_detection(decoded)
+            return [self._simulate_detection(image) for image in decoded]
+
+        except Exception as e:
+            raise ValueError(f"Image processing failed: {str(e)}")
+
+    def _open_image(self, image_data: bytes) -> Image.Image:
+        """Decode an image; in simulation mode JPEGs are decoded at reduced scale"""
+        image = Image.open(io.BytesIO(image_data))
+        if self.simulated:
+            # Only mean brightness is used, so let libjpeg downscale while
+            # decoding (DCT scaling, up to 1/8); no-op for other formats
+            image.draft("RGB", (64, 64))
+        image.load()
+        return image
+
+    def _load_onnx_model(self, model_path: str) -> None:
+        """Create the ONNX Runtime session (CUDA when available, else CPU)"""
+        import onnxruntime as ort  # Optional dependency, only needed with a model
+        
+        available = ort.get_available_providers()
+        providers = [p for p in ("CUDAExecutionProvider", "CPUExecutionProvider") if p in available]
+        self._session = ort.InferenceSession(model_path, providers=providers)
+        
+        # Input layout is NCHW; dimensions may be symbolic for dynamic exports
+        model_input = self._session.get_inputs()[0]
+        batch, _, height, width = model_input.shape
+        self._input_name = model_input.name
+        self._input_dtype = np.uint8 if model_input.type == "tensor(uint8)" else np.float32
+        self._input_size = (
+            width if isinstance(width, int) else 640,
+            height if isinstance(height, int) else 640
+        )
+        self._single_image_batches = batch == 1
+        
+        # Ultralytics exports store class names as "{0: 'person', 1: 'bicycle', ...}"
+        names = self._session.get_modelmeta().custom_metadata_map.get("names", "{}")
+        self._class_names = ast.literal_eval(names)
+        self._class_categories = {
+            idx: self._category_for_class(name) for idx, name in self._class_names.items()
+        }
+        self.simulated = False
+    
+    def _category_for_class(self, class_name: str) -> Optional[str]:
+        """Environmental category with a keyword among a model class name's words"""
+        # Whole words only, so e.g. "carrot" doesn't count as a car
+        words = set(re.split(r"[\s_]+", class_name.lower()))
+        for category in self._CATEGORY_KEYS:
+            if words.intersection(self.categories[category]["keywords"]):
+                return category
+        return None
+    
+    def _onnx_detection(self, images: List[Image.Image]) -> List[Dict]:
+        """Run the ONNX model on a batch of decoded images"""
+        if self._single_image_batches and len(images) > 1:
+            # Model was exported with a fixed batch size of 1
+            return [self._onnx_detection([image])[0] for image in images]
+        
+        # Resize, NHWC -> NCHW, scale to [0, 1] for float models
+        batch = np.stack([
+            np.asarray(image.convert("RGB").resize(self._input_size), dtype=np.uint8)
+            for image in images
+        ]).transpose(0, 3, 1, 2)
+        if self._input_dtype is np.float32:
+            batch = batch.astype(np.float32) / 255.0
+        
+        outputs = self._session.run(None, {self._input_name: np.ascontiguousarray(batch)})[0]
+        return [self._onnx_result(predictions) for predictions in outputs]
+    
+    def _onnx_result(self, predictions: np.ndarray) -> Dict:
+        """
+        Turn one image's YOLOv8 output into a detection result.
+        
+        `predictions` is (4 + num_classes, num_anchors): box coordinates, then
+        class scores. Each category's evidence is its strongest detection.
+        """
+        class_scores = predictions[4:]
+        best_class = class_scores.argmax(axis=0)
+        best_score = class_scores.max(axis=0)
+        keep = best_score >= self._ONNX_CONF_THRESHOLD
+        
+        # Strongest detection per class, highest first
+        strongest = {}
+        for cls, score in sorted(zip(best_class[keep].tolist(), best_score[keep].tolist()),
+                                 key=lambda item: item[1], reverse=True):
+            strongest.setdefault(cls, score)
+        
+        # Only classes that map to a category count as evidence
+        evidence = dict.fromkeys(self._CATEGORY_KEYS, 0.0)
+        detected_objects = []
+        for cls, score in strongest.items():
+            category = self._class_categories.get(cls)
+            if category is None:
+                continue
+            evidence[category] = max(evidence[category], score)
+            if len(detected_objects) < 4:
+                detected_objects.append(self._class_names[cls])
+        
+        total = sum(evidence.values())
+        if total == 0:
+            # Nothing environmental above the threshold (or no class names in the model)
+            return {
+                "detected_category": self._NO_DETECTION,
+                "confidence": 0.0,
+                "scores": dict.fromkeys(self._CATEGORY_KEYS, 0.0),
+                "detected_objects": [],
+                "explanation": "No environmental indicators detected. "
+                               "Try a clearer photo, or select the category manually."
+            }
+        
+        scores = {k: round(v / total, 2) for k, v in evidence.items()}
+        detected_category = max(evidence, key=evidence.get)
+        confidence = round(evidence[detected_category], 2)
+        
+        return {
+            "detected_category": detected_category,
+            "confidence": confidence,
+            "scores": scores,
+            "detected_objects": detected_objects,
+            "explanation": self._generate_explanation(detected_category, confidence, detected_objects)
+        }
     
     def _simulate_detection(self, image: Image.Image) -> Dict:
         """
@@ -88,28 +291,24 @@ class YOLODetector:
         - Probabilistic modeling of real-world scenarios
         - Confidence calibration
         """
-        # Analyze image properties
-        img_array = np.array(image)
-        brightness = img_array.mean()
+        # Analyze image properties on a small grayscale thumbnail; the mean
+        # barely changes and we avoid copying the full-size pixel buffer
+        # (a real model would take a zero-copy np.asarray(image) instead)
+        thumb = image.convert("L").resize((32, 32), Image.BILINEAR)
+        brightness = np.asarray(thumb, dtype=np.uint8).mean()
         
         # Calculate category scores with realistic variance
         # In production, these would come from actual YOLO model output
         
-        # Base probabilities (sum to ~1.0)
-        base_probs = {
-            "air": random.uniform(0.15, 0.45),
-            "garbage": random.uniform(0.10, 0.35),
-            "construction": random.uniform(0.15, 0.40),
-            "water": random.uniform(0.05, 0.25)
-        }
-        
-        # Normalize to sum to 1.0
-        total = sum(base_probs.values())
-        scores = {k: round(v / total, 2) for k, v in base_probs.items()}
+        # Probability vector over categories, already normalized to sum to 1.0
+        scores_arr = self._rng.dirichlet(self._dirichlet_alpha)
+        rounded = scores_arr.round(2).tolist()
+        scores = dict(zip(self._CATEGORY_KEYS, rounded))
         
         # Detect primary category
-        detected_category = max(scores, key=scores.get)
-        confidence = scores[detected_category]
+        idx = int(scores_arr.argmax())
+        detected_category = self._CATEGORY_KEYS[idx]
+        confidence = rounded[idx]
         
         # Simulate object detection
         detected_objects = self._generate_detected_objects(detected_category, confidence)
@@ -131,20 +330,15 @@ class YOLODetector:
     
     def _generate_detected_objects(self, category: str, confidence: float) -> List[str]:
         """Generate plausible detected objects based on category"""
-        
-        object_pools = {
-            "air": ["vehicle", "truck", "car", "motorcycle", "smoke", "traffic"],
-            "garbage": ["plastic_bag", "bottle", "trash_pile", "waste_container", "litter"],
-            "construction": ["construction_equipment", "dust_cloud", "building", "crane", "excavation"],
-            "water": ["water_body", "sewage", "drain", "algae_growth", "contamination"]
-        }
-        
-        pool = object_pools.get(category, [])
+        subsets_by_size = self._OBJECT_SUBSETS.get(category)
+        if subsets_by_size is None:
+            return []
         
         # Number of objects increases with confidence
         num_objects = 2 if confidence < 0.5 else 3 if confidence < 0.7 else 4
         
-        return random.sample(pool, min(num_objects, len(pool)))
+        subsets = subsets_by_size[num_objects]
+        return list(subsets[self._rng.integers(len(subsets))])
     
     def _generate_explanation(self, category: str, confidence: float, objects: List[str]) -> str:
         """Generate human-readable explanation of detection"""
@@ -157,33 +351,23 @@ class YOLODetector:
         else:
             conf_desc = "Low confidence"
         
-        # Category-specific explanations
-        explanations = {
-            "air": f"{conf_desc} detection of air pollution indicators. Detected: {', '.join(objects)}. "
-                   "This suggests vehicular or industrial emissions. AI recommendation: verify with citizen observation.",
-            
-            "garbage": f"{conf_desc} detection of waste accumulation. Identified: {', '.join(objects)}. "
-                      "Visible garbage and litter patterns detected. Recommendation: cross-reference with location history.",
-            
-            "construction": f"{conf_desc} detection of construction-related pollution. Found: {', '.join(objects)}. "
-                           "Construction activity and dust generation indicators present. Consider time of day and weather context.",
-            
-            "water": f"{conf_desc} detection of water pollution indicators. Detected: {', '.join(objects)}. "
-                    "Water quality concerns visible. Requires field verification for contamination assessment."
-        }
-        
-        explanation = explanations.get(category, "Detection analysis completed.")
+        # Only the selected category's template is filled in
+        template = self._EXPLANATION_TEMPLATES.get(category)
+        if template is None:
+            explanation = "Detection analysis completed."
+        else:
+            explanation = template.format(conf=conf_desc, objs=", ".join(objects))
         
         # Add confidence caveat for low scores
         if confidence < 0.6:
-            explanation += " ⚠️ Lower confidence suggests ambiguous visual conditions or mixed environmental factors."
+            explanation += self._LOW_CONFIDENCE_NOTE
         
         return explanation
     
     def get_model_info(self) -> Dict:
         """Return information about the detection model"""
         return {
-            "model": "YOLOv8-Environmental (Simulated)",
+            "model": "YOLOv8-Environmental (Simulated)" if self.simulated else "YOLOv8 (ONNX Runtime)",
             "categories": list(self.categories.keys()),
             "note": "AI-assisted preliminary classification. Not a replacement for official sensors or measurements.",
             "accuracy": "Trained on 10K+ environmental images (simulated)",
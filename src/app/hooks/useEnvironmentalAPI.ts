@@ -301,17 +301,24 @@ export function useSubmitReport() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const submitReport = async (report: any) => {
+  const submitReport = async (report: any, image?: File) => {
     try {
       setLoading(true);
       setError(null);
 
+      // Multipart upload: image as raw binary, yolo_result as a JSON field
+      const formData = new FormData();
+      if (image) {
+        formData.append('file', image);
+      }
+      Object.entries(report).forEach(([key, value]) => {
+        if (value === undefined || value === null) return;
+        formData.append(key, typeof value === 'object' ? JSON.stringify(value) : String(value));
+      });
+
       const response = await fetch(`${API_BASE_URL}/api/report/submit`, {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify(report),
+        body: formData,
       });
 
       if (!response.ok) {
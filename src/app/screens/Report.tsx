@@ -162,23 +162,24 @@ export default function Report() {
   // ✅ UPDATED: Submit report to backend
   const handleSubmit = async () => {
     try {
-      // Prepare report data
-      const report = {
-        category: selectedCategory,
-        latitude: userCoords.latitude,
-        longitude: userCoords.longitude,
-        location_name: `${userCoords.latitude.toFixed(4)}, ${userCoords.longitude.toFixed(4)}`,
-        yolo_result: yoloResult,
-        timestamp: new Date().toISOString()
-      };
+      // Prepare report data as multipart form (image sent as raw binary)
+      const formData = new FormData();
+      if (capturedFile) {
+        formData.append('file', capturedFile);
+      }
+      formData.append('category', selectedCategory ?? '');
+      formData.append('latitude', String(userCoords.latitude));
+      formData.append('longitude', String(userCoords.longitude));
+      formData.append('location_name', `${userCoords.latitude.toFixed(4)}, ${userCoords.longitude.toFixed(4)}`);
+      if (yoloResult) {
+        formData.append('yolo_result', JSON.stringify(yoloResult));
+      }
+      formData.append('timestamp', new Date().toISOString());
       
       // ✅ NEW: Submit to backend
       const response = await fetch('http://localhost:8000/api/report/submit', {
         method: 'POST',
-        headers: {
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify(report)
+        body: formData
       });
       
       if (response.ok) {